@@ -0,0 +1,80 @@
+import os
+import threading
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+from openrecall.config import appdata_folder
+from openrecall.database import get_new_entries
+from openrecall.nlp import EMBEDDING_DIM, decode_embedding
+
+INDEX_PATH = os.path.join(appdata_folder, "ann_index.bin")
+SAVE_EVERY = 1000  # additions between index saves
+
+_index = None
+_max_id = 0
+_unsaved = 0
+_lock = threading.Lock()
+
+
+def is_available():
+    return hnswlib is not None
+
+
+def _create_index(max_elements=1024):
+    index = hnswlib.Index(space="ip", dim=EMBEDDING_DIM)
+    index.init_index(max_elements=max_elements, ef_construction=200, M=16)
+    index.set_ef(64)
+    return index
+
+
+def _load_index():
+    global _index, _max_id
+    if os.path.exists(INDEX_PATH):
+        _index = hnswlib.Index(space="ip", dim=EMBEDDING_DIM)
+        _index.load_index(INDEX_PATH)
+        _index.set_ef(64)
+        ids = _index.get_ids_list()
+        _max_id = max(ids) if ids else 0
+    else:
+        _index = _create_index()
+        _max_id = 0
+
+
+def _sync():
+    global _max_id, _unsaved
+    if _index is None:
+        _load_index()
+    new_entries = get_new_entries(_max_id)
+    if not new_entries:
+        return
+    vectors = np.vstack(
+        [decode_embedding(entry.embedding) for entry in new_entries]
+    )
+    ids = np.array([entry.id for entry in new_entries], dtype=np.int64)
+    needed = _index.get_current_count() + len(ids)
+    if needed > _index.get_max_elements():
+        _index.resize_index(max(needed, 2 * _index.get_max_elements()))
+    _index.add_items(vectors, ids)
+    _max_id = int(ids.max())
+    # Saving rewrites the whole file, so do it only occasionally; anything
+    # unsaved at a crash is re-added from the database on the next load
+    _unsaved += len(ids)
+    if _unsaved >= SAVE_EVERY:
+        _index.save_index(INDEX_PATH)
+        _unsaved = 0
+
+
+def query(embedding, k=50):
+    """Return the ids of the k nearest entries, best match first."""
+    with _lock:
+        _sync()
+        count = _index.get_current_count()
+        if count == 0:
+            return []
+        labels, _ = _index.knn_query(embedding, k=min(k, count))
+        return [int(label) for label in labels[0]]
@@ -1,22 +1,30 @@
-from threading import Thread
+import logging
+from threading import Lock, Thread
 
 import numpy as np
-from flask import Flask, render_template_string, request, send_from_directory, jsonify
+from flask import Flask, render_template_string, request, jsonify
+from flask_caching import Cache
 from jinja2 import BaseLoader
 
+from openrecall import ann
 from openrecall.config import appdata_folder, screenshots_path
 from openrecall.database import (
     create_db,
-    get_all_entries,
+    get_entries_by_ids,
+    get_new_entries,
     get_timestamps,
     get_transcriptions,
 )
-from openrecall.nlp import cosine_similarity, get_embedding
+from openrecall.nlp import decode_embedding, get_embedding
 from openrecall.screenshot import record_screenshots_thread
 from openrecall.utils import human_readable_time, timestamp_to_human_readable
 from openrecall.audio_capture import start_audio_capture, stop_audio_capture
 
-app = Flask(__name__)
+# Serve screenshots through the static machinery rather than a Python view;
+# the files never change once written, so let browsers cache them for good
+app = Flask(__name__, static_folder=screenshots_path, static_url_path="/static")
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 31536000
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 300})
 
 
 app.jinja_env.filters["human_readable_time"] = human_readable_time
@@ -121,7 +129,39 @@ class StringLoader(BaseLoader):
 app.jinja_env.loader = StringLoader()
 
 
+# Number of results a search returns
+TOPK = 50
+
+# In-memory mirror of the entries table plus the stacked embedding matrix,
+# synced incrementally by id so searches never rescan SQLite or re-parse
+# already seen BLOBs. Entries hold text fields, so they stay as a plain list
+# next to the contiguous float32 matrix rather than one structured array.
+_entry_cache = {"max_id": 0, "entries": [], "matrix": None}
+_entry_lock = Lock()
+
+
+def _entries_to_matrix(entries):
+    # Embeddings are stored unit-normalized, so no row norms are needed here.
+    return np.vstack([decode_embedding(entry.embedding) for entry in entries])
+
+
+def get_cached_entries():
+    # Concurrent requests sync the same cache, so serialize like ann._sync
+    with _entry_lock:
+        new_entries = get_new_entries(_entry_cache["max_id"])
+        if new_entries:
+            new_rows = _entries_to_matrix(new_entries)
+            if _entry_cache["matrix"] is None:
+                _entry_cache["matrix"] = new_rows
+            else:
+                _entry_cache["matrix"] = np.vstack([_entry_cache["matrix"], new_rows])
+            _entry_cache["entries"] = _entry_cache["entries"] + new_entries
+            _entry_cache["max_id"] = new_entries[-1].id
+        return _entry_cache["entries"], _entry_cache["matrix"]
+
+
 @app.route("/")
+@cache.cached(timeout=10)
 def timeline():
     timestamps = get_timestamps()
     return render_template_string(
@@ -185,20 +225,30 @@ def timeline():
 
 
 @app.route("/transcriptions/<int:timestamp>")
+@cache.cached(timeout=30)
 def get_transcriptions_for_timestamp(timestamp):
     transcriptions = get_transcriptions(timestamp)
     return jsonify({"transcriptions": transcriptions})
 
 
 @app.route("/search")
+@cache.cached(timeout=60, query_string=True)
 def search():
     q = request.args.get("q")
-    entries = get_all_entries()
-    embeddings = [np.frombuffer(entry.embedding, dtype=np.float64) for entry in entries]
     query_embedding = get_embedding(q)
-    similarities = [cosine_similarity(query_embedding, emb) for emb in embeddings]
-    indices = np.argsort(similarities)[::-1]
-    sorted_entries = [entries[i] for i in indices]
+    if ann.is_available():
+        sorted_entries = get_entries_by_ids(ann.query(query_embedding, k=TOPK))
+    else:
+        entries, matrix = get_cached_entries()
+        if matrix is None:
+            sorted_entries = []
+        else:
+            similarities = matrix @ query_embedding
+            # Partition out the top K, then only sort that slice
+            k = min(TOPK, len(entries))
+            top = np.argpartition(-similarities, k - 1)[:k]
+            indices = top[np.argsort(similarities[top])[::-1]]
+            sorted_entries = [entries[i] for i in indices]
 
     return render_template_string(
         """
@@ -239,11 +289,6 @@ def search():
     )
 
 
-@app.route("/static/<filename>")
-def serve_image(filename):
-    return send_from_directory(screenshots_path, filename)
-
-
 @app.route("/start_audio", methods=["POST"])
 def start_audio():
     start_audio_capture()
@@ -259,6 +304,9 @@ def stop_audio():
 if __name__ == "__main__":
     create_db()
 
+    # Per-request access logging just adds noise and overhead
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
     print(f"Appdata folder: {appdata_folder}")
 
     # Start the thread to record screenshots
@@ -5,17 +5,55 @@ from faster_whisper import WhisperModel
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 import threading
-import queue
 import time
-import tempfile
 import os
 import wave
-from openrecall.database import insert_entry
-from openrecall.nlp import get_embedding
+from queue import Empty
 from openrecall.config import appdata_folder
+from openrecall.ringbuffer import SPSCRingBuffer
+from openrecall.worker import queue_entry
 
-# Initialize Whisper model with a larger, more accurate model
-model = WhisperModel("medium.en", device="cpu", compute_type="int8")
+try:
+    import torch
+
+    _has_cuda = torch.cuda.is_available()
+except ImportError:
+    _has_cuda = False
+
+
+def _load_whisper_model():
+    # Prefer GPU float16, then quantized CPU, then a smaller model if the
+    # preferred one cannot be loaded on this machine. Model and compute
+    # type can be overridden via OPENRECALL_WHISPER_MODEL and
+    # OPENRECALL_WHISPER_COMPUTE, e.g. base.en for CPU-only speed.
+    name = os.environ.get("OPENRECALL_WHISPER_MODEL", "medium.en")
+    compute = os.environ.get("OPENRECALL_WHISPER_COMPUTE")
+    cpu_threads = os.cpu_count() or 4
+    candidates = []
+    if _has_cuda:
+        candidates.append((name, "cuda", compute or "float16"))
+    candidates.append((name, "cpu", compute or "int8"))
+    if name != "base.en":
+        candidates.append(("base.en", "cpu", compute or "int8"))
+    for model_name, device, compute_type in candidates[:-1]:
+        try:
+            return WhisperModel(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads if device == "cpu" else 0,
+            )
+        except Exception as e:
+            print(
+                f"Could not load Whisper {model_name} on {device} ({compute_type}): {e}"
+            )
+    model_name, device, compute_type = candidates[-1]
+    return WhisperModel(
+        model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads
+    )
+
+
+model = _load_whisper_model()
 
 # Audio recording parameters
 CHUNK = 1024
@@ -26,11 +64,19 @@ RATE = 16000
 # Voice activity detection parameters
 SILENCE_THRESHOLD = 300  # Adjusted for int16 data
 MIN_SILENCE_LENGTH = 0.5  # seconds
+MAX_UTTERANCE_SECONDS = 60  # Force a transcription once the buffer fills up
+BATCH_SECONDS = 15  # Transcribe once this much audio is pending
+TRAILING_SILENCE_SECONDS = 2  # Transcribe whatever is pending after this much quiet
+
+# Set OPENRECALL_AUDIO_DEBUG=1 to save raw capture WAVs and print
+# transcriptions; both cost time on the audio threads so they are off by
+# default
+DEBUG = os.environ.get("OPENRECALL_AUDIO_DEBUG") == "1"
 
 
 class AudioProcessor:
     def __init__(self):
-        self.audio_queue = queue.Queue()
+        self.audio_queue = SPSCRingBuffer()
         self.is_recording = False
         self.p = pyaudio.PyAudio()
         self.debug_counter = 0
@@ -63,16 +109,26 @@ class AudioProcessor:
         )
 
         debug_frames = []
+        dropped_chunks = 0
         while self.is_recording:
             try:
                 data = stream.read(CHUNK, exception_on_overflow=False)
-                self.audio_queue.put(data)
-                debug_frames.append(data)
+                if not self.audio_queue.put(data):
+                    # Log once per episode, not per chunk; printing here
+                    # would stall the capture thread
+                    dropped_chunks += 1
+                    if DEBUG:
+                        print("Audio buffer full, dropping chunk")
+                elif dropped_chunks:
+                    print(f"Audio buffer recovered, dropped {dropped_chunks} chunks")
+                    dropped_chunks = 0
 
                 # Save debug audio every 10 seconds
-                if len(debug_frames) >= (RATE // CHUNK) * 10:
-                    self._save_debug_audio(debug_frames)
-                    debug_frames = []
+                if DEBUG:
+                    debug_frames.append(data)
+                    if len(debug_frames) >= (RATE // CHUNK) * 10:
+                        self._save_debug_audio(debug_frames)
+                        debug_frames = []
             except OSError as e:
                 print(f"Error reading audio stream: {e}")
                 time.sleep(0.1)
@@ -94,79 +150,123 @@ class AudioProcessor:
         print(f"Saved debug audio: {debug_filename}")
 
     def _process_audio(self):
-        buffer = []
-        silence_start = None
+        # Preallocated utterance buffer; chunks are written at an offset
+        # instead of being collected in a list and joined on every flush.
+        utterance = bytearray(2 * RATE * MAX_UTTERANCE_SECONDS)
+        used = 0
+        # Silence is measured by counting silent samples rather than calling
+        # time.time() per chunk; the sample rate already fixes the timing
+        silent_samples = 0
+        # Completed utterances waiting to be transcribed, each paired with
+        # its capture start time; batching them into one transcribe call
+        # amortizes the per-call model overhead.
+        pending = []
+
+        def flush():
+            nonlocal used
+            if used:
+                np_data = np.frombuffer(memoryview(utterance)[:used], dtype=np.int16)
+                start_time = time.time() - used / (2 * RATE)
+                pending.append((start_time, np_data.astype(np.float32) / 32768.0))
+                used = 0
+            if sum(samples.size for _, samples in pending) >= RATE * BATCH_SECONDS:
+                transcribe_pending()
+
+        def transcribe_pending():
+            if pending:
+                # Remember where each utterance starts in the batch so the
+                # decoded segments keep their capture timestamps
+                starts = []
+                offset = 0
+                for start_time, samples in pending:
+                    starts.append((offset, start_time))
+                    offset += samples.size
+                chunks = [samples for _, samples in pending]
+                batch = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+                self._transcribe_audio(batch, starts)
+                pending.clear()
+        # Scratch buffer for the mean-abs VAD check, reused across chunks.
+        # Widening to int32 also avoids overflow on abs(-32768).
+        abs_scratch = np.empty(CHUNK, dtype=np.int32)
+        # Reusable chunk buffer with a persistent int16 view over it, so no
+        # numpy array is allocated per chunk.
+        chunk_scratch = bytearray(2 * CHUNK)
+        chunk_view = np.frombuffer(chunk_scratch, dtype=np.int16)
 
         while self.is_recording or not self.audio_queue.empty():
             try:
                 data = self.audio_queue.get(timeout=1)
-                buffer.append(data)
 
-                # Convert bytes to numpy array
-                np_data = np.frombuffer(data, dtype=np.int16)
+                # Copy into the reusable buffer and view it as int16
+                chunk_scratch[: len(data)] = data
+                np_data = chunk_view[: len(data) // 2]
 
                 # Check for voice activity
-                if np.abs(np_data).mean() < SILENCE_THRESHOLD:
-                    if silence_start is None:
-                        silence_start = time.time()
-                elif silence_start is not None:
-                    silence_duration = time.time() - silence_start
-                    if silence_duration >= MIN_SILENCE_LENGTH:
-                        # Process the audio chunk
-                        self._transcribe_audio(b"".join(buffer))
-                        buffer = []
-                    silence_start = None
-            except queue.Empty:
-                # If no data for 1 second, process whatever is in the buffer
-                if buffer:
-                    self._transcribe_audio(b"".join(buffer))
-                    buffer = []
+                abs_view = abs_scratch[: np_data.size]
+                np.abs(np_data, out=abs_view, dtype=np.int32)
+                if abs_view.mean() < SILENCE_THRESHOLD:
+                    silent_samples += np_data.size
+                    if silent_samples >= RATE * MIN_SILENCE_LENGTH:
+                        # The utterance is over; process it and drop the
+                        # ongoing silence instead of buffering it
+                        flush()
+                        if pending and silent_samples >= RATE * TRAILING_SILENCE_SECONDS:
+                            # Quiet has settled in; don't sit on a short
+                            # batch waiting for more speech
+                            transcribe_pending()
+                        continue
+                else:
+                    silent_samples = 0
+
+                if used + len(data) > len(utterance):
+                    flush()
+                utterance[used : used + len(data)] = data
+                used += len(data)
+            except Empty:
+                # If no data for 1 second, process whatever is buffered
+                flush()
+                transcribe_pending()
 
         # Process any remaining audio
-        if buffer:
-            self._transcribe_audio(b"".join(buffer))
-
-    def _transcribe_audio(self, audio_chunk):
-        # Convert bytes to numpy array
-        np_data = np.frombuffer(audio_chunk, dtype=np.int16)
-
-        # Convert to float32 and normalize
-        float_data = np_data.astype(np.float32) / 32768.0
-
-        # Create a temporary WAV file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-            temp_wav_path = temp_wav.name
-            wf = wave.open(temp_wav_path, "wb")
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(2)  # 2 bytes for int16
-            wf.setframerate(RATE)
-            wf.writeframes(audio_chunk)
-            wf.close()
+        flush()
+        transcribe_pending()
 
+    def _transcribe_audio(self, float_data, starts):
+        # float_data is normalized float32 samples; faster-whisper accepts
+        # the array directly, so no temporary WAV file is needed. starts
+        # maps batch sample offsets to utterance capture times.
         try:
             # Transcribe
-            segments, info = model.transcribe(temp_wav_path, beam_size=5, language="en")
+            segments, info = model.transcribe(
+                float_data,
+                beam_size=5,
+                language="en",
+                vad_filter=True,
+                vad_parameters={"min_silence_duration_ms": 500},
+            )
 
             for segment in segments:
                 text = segment.text.strip()
                 if text:  # Only process non-empty transcriptions
-                    timestamp = int(time.time())
-                    embedding = get_embedding(text)
-
-                    # Insert into database
-                    insert_entry(
+                    # Stamp with the capture time of the utterance the
+                    # segment falls in, not the decode time
+                    segment_sample = int(segment.start * RATE)
+                    batch_offset, start_time = starts[0]
+                    for offset, utterance_start in starts:
+                        if offset > segment_sample:
+                            break
+                        batch_offset, start_time = offset, utterance_start
+                    timestamp = int(start_time + (segment_sample - batch_offset) / RATE)
+                    queue_entry(
                         text,
                         timestamp,
-                        embedding,
                         "AudioTranscription",
                         f"Transcription at {timestamp}",
                     )
-                    print(f"Transcribed: {text}")  # Debug print
+                    if DEBUG:
+                        print(f"Transcribed: {text}")
         except Exception as e:
             print(f"Transcription error: {e}")
-        finally:
-            # Clean up the temporary file
-            os.unlink(temp_wav_path)
 
 
 audio_processor = AudioProcessor()
@@ -21,6 +21,26 @@ def get_all_entries() -> List[Entry]:
         results = c.execute("SELECT * FROM entries").fetchall()
         return [Entry(*result) for result in results]
 
+def get_new_entries(last_id: int) -> List[Entry]:
+    with sqlite3.connect(db_path) as conn:
+        c = conn.cursor()
+        results = c.execute(
+            "SELECT * FROM entries WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        return [Entry(*result) for result in results]
+
+def get_entries_by_ids(ids: List[int]) -> List[Entry]:
+    if not ids:
+        return []
+    placeholders = ",".join("?" * len(ids))
+    with sqlite3.connect(db_path) as conn:
+        c = conn.cursor()
+        results = c.execute(
+            f"SELECT * FROM entries WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        by_id = {result[0]: Entry(*result) for result in results}
+        return [by_id[id] for id in ids if id in by_id]
+
 def get_timestamps() -> List[int]:
     with sqlite3.connect(db_path) as conn:
         c = conn.cursor()
@@ -1,15 +1,64 @@
+import threading
+from functools import lru_cache
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2 output width
 
-def get_embedding(text):
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+_model = None
+_model_lock = threading.Lock()
+_encode_lock = threading.Lock()
+
+
+def load_model():
+    """Load the shared sentence-transformer, constructing it on first call.
+
+    Both the request thread and the capture worker can hit a cold model,
+    so the construction is serialized.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = SentenceTransformer("all-MiniLM-L6-v2")
+        return _model
+
+
+def compute_embedding(text):
+    """Embed text without caching; used for captured text, which rarely
+    repeats and would only evict cached queries."""
+    model = load_model()
     sentences = text.split("\n")
-    sentence_embeddings = model.encode(sentences)
+    # One inference at a time; concurrent encodes just contend for the
+    # same cores and each run slower
+    with _encode_lock:
+        sentence_embeddings = model.encode(sentences)
     mean = np.mean(sentence_embeddings, axis=0)
-    mean = mean.astype(np.float64)
+    mean = mean.astype(np.float32)
+    norm = np.linalg.norm(mean)
+    if norm > 0:
+        mean /= norm
+    # Cached arrays are shared between callers, so guard against mutation.
+    mean.flags.writeable = False
     return mean
 
 
+@lru_cache(maxsize=4096)
+def get_embedding(text):
+    return compute_embedding(text)
+
+
+def decode_embedding(blob):
+    """Decode a stored embedding BLOB, handling legacy float64 rows."""
+    if len(blob) == 8 * EMBEDDING_DIM:
+        # Written before embeddings were stored as normalized float32
+        vec = np.frombuffer(blob, dtype=np.float64).astype(np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+    return np.frombuffer(blob, dtype=np.float32)
+
+
 def cosine_similarity(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    return np.dot(a, b) / np.sqrt(np.vdot(a, a) * np.vdot(b, b))
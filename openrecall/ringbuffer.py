@@ -0,0 +1,41 @@
+import time
+from queue import Empty
+
+
+class SPSCRingBuffer:
+    """Fixed-size single-producer single-consumer ring of audio chunks.
+
+    The recording thread is the only writer and the processing thread the
+    only reader, so the GIL makes the index updates safe without taking a
+    lock on every chunk like queue.Queue does.
+    """
+
+    # ~4.4 minutes of 2KB chunks (about 8MB), enough to ride out a slow
+    # synchronous transcription without dropping audio
+    def __init__(self, capacity=4096):
+        self._slots = [None] * capacity
+        self._capacity = capacity
+        self._head = 0  # total chunks written, producer only
+        self._tail = 0  # total chunks read, consumer only
+
+    def put(self, item):
+        if self._head - self._tail >= self._capacity:
+            return False
+        self._slots[self._head % self._capacity] = item
+        self._head += 1
+        return True
+
+    def get(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._tail == self._head:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise Empty
+            time.sleep(0.005)
+        slot = self._tail % self._capacity
+        item = self._slots[slot]
+        self._slots[slot] = None
+        self._tail += 1
+        return item
+
+    def empty(self):
+        return self._tail == self._head
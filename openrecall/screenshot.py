@@ -7,10 +7,9 @@ import numpy as np
 from PIL import Image
 
 from openrecall.config import screenshots_path, args
-from openrecall.database import insert_entry
-from openrecall.nlp import get_embedding
 from openrecall.ocr import extract_text_from_image
 from openrecall.utils import get_active_app_name, get_active_window_title, is_user_active
+from openrecall.worker import queue_entry
 
 def mean_structured_similarity_index(img1, img2, L=255):
     K1, K2 = 0.01, 0.03
@@ -80,12 +79,9 @@ def record_screenshots_thread():
                     lossless=True,
                 )
                 text = extract_text_from_image(screenshot)
-                embedding = get_embedding(text)
                 active_app_name = get_active_app_name()
                 active_window_title = get_active_window_title()
-                insert_entry(
-                    text, timestamp, embedding, active_app_name, active_window_title
-                )
+                queue_entry(text, timestamp, active_app_name, active_window_title)
 
         time.sleep(3)
 
@@ -0,0 +1,31 @@
+import threading
+from queue import Queue
+
+from openrecall.database import insert_entry
+from openrecall.nlp import compute_embedding, load_model
+
+_queue = Queue()
+
+
+def _process_entries():
+    # Warm the embedding model so the first capture or search does not
+    # pay the load cost on its own thread
+    load_model()
+    while True:
+        text, timestamp, app, title = _queue.get()
+        try:
+            embedding = compute_embedding(text)
+            insert_entry(text, timestamp, embedding, app, title)
+        except Exception as e:
+            print(f"Error embedding entry: {e}")
+        finally:
+            _queue.task_done()
+
+
+_thread = threading.Thread(target=_process_entries, daemon=True)
+_thread.start()
+
+
+def queue_entry(text, timestamp, app, title):
+    """Embed and insert an entry on the shared background worker thread."""
+    _queue.put((text, timestamp, app, title))
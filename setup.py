@@ -9,6 +9,7 @@ with io.open("README.md", "r", encoding="utf-8") as f:
 
 install_requires = [
     "Flask==3.0.3",
+    "Flask-Caching==2.3.0",
     "numpy==1.26.4",
     "mss==9.0.1",
     "sentence-transformers==3.0.1",
@@ -30,6 +31,7 @@ extras_require = {
     "windows": ["pywin32", "psutil"],
     "macos": ["pyobjc==10.3.1"],
     "linux": [],
+    "ann": ["hnswlib==0.8.0"],
     "python-doctr": [
         "python-doctr @ git+https://github.com/koenvaneijk/doctr.git@af711bc04eb8876a7189923fb51ec44481ee18cd"
     ],
@@ -0,0 +1,28 @@
+import numpy as np
+from unittest import mock
+
+from openrecall.database import create_db, get_entries_by_ids, insert_entry
+
+def _populate(db_path, texts):
+    with mock.patch('openrecall.database.db_path', db_path):
+        create_db()
+        for text in texts:
+            insert_entry(text, 1, np.zeros(4, dtype=np.float32), "App", "Title")
+
+def test_get_entries_by_ids_preserves_order(tmp_path):
+    db_path = str(tmp_path / 'recall.db')
+    _populate(db_path, ["one", "two", "three"])
+    with mock.patch('openrecall.database.db_path', db_path):
+        entries = get_entries_by_ids([3, 1, 2])
+        assert [entry.id for entry in entries] == [3, 1, 2]
+        assert [entry.text for entry in entries] == ["three", "one", "two"]
+
+def test_get_entries_by_ids_skips_missing(tmp_path):
+    db_path = str(tmp_path / 'recall.db')
+    _populate(db_path, ["one", "two"])
+    with mock.patch('openrecall.database.db_path', db_path):
+        entries = get_entries_by_ids([2, 99, 1])
+        assert [entry.id for entry in entries] == [2, 1]
+
+def test_get_entries_by_ids_empty():
+    assert get_entries_by_ids([]) == []
@@ -0,0 +1,39 @@
+import pytest
+from queue import Empty
+from openrecall.ringbuffer import SPSCRingBuffer
+
+def test_fifo_order():
+    buf = SPSCRingBuffer(capacity=4)
+    buf.put(b"a")
+    buf.put(b"b")
+    buf.put(b"c")
+    assert buf.get() == b"a"
+    assert buf.get() == b"b"
+    assert buf.get() == b"c"
+
+def test_wraparound():
+    buf = SPSCRingBuffer(capacity=3)
+    for i in range(10):
+        assert buf.put(i) is True
+        assert buf.get() == i
+
+def test_put_returns_false_when_full():
+    buf = SPSCRingBuffer(capacity=2)
+    assert buf.put(b"a") is True
+    assert buf.put(b"b") is True
+    assert buf.put(b"c") is False
+    assert buf.get() == b"a"
+    assert buf.put(b"c") is True
+
+def test_get_timeout_raises_empty():
+    buf = SPSCRingBuffer(capacity=2)
+    with pytest.raises(Empty):
+        buf.get(timeout=0.01)
+
+def test_empty():
+    buf = SPSCRingBuffer(capacity=2)
+    assert buf.empty()
+    buf.put(b"a")
+    assert not buf.empty()
+    buf.get()
+    assert buf.empty()